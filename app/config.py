@@ -1,7 +1,8 @@
 import os
 import sys
 import importlib
-from pydantic_settings import BaseSettings
+from functools import lru_cache
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Optional
 
 class Settings(BaseSettings):
@@ -30,12 +31,17 @@ class Settings(BaseSettings):
     
     # Performance Optimization - TESTED AND WORKING
     enable_hpi: bool = True                          # ✅ High Performance Inference for CPU
+    hpi_fallback: bool = False                       # Retry without HPI if the HPI plugin is missing (opt-in)
+    paddlex_config: Optional[str] = None             # PaddleX pipeline YAML, e.g. per-module hpi_config backend (None = built-in)
     device: str = "cpu"                              # CPU-only production environment
+    cpu_threads: Optional[int] = None                # Paddle CPU math threads (None = PPStructureV3 default)
+    pipeline_workers: int = 1                        # Parallel worker processes for batch runs (1 = sequential)
     
     # Processing Pipeline Configuration  
     use_doc_orientation_classify: Optional[bool] = None    # Use PPStructureV3 defaults
     use_doc_unwarping: Optional[bool] = None               # Use PPStructureV3 defaults
     use_textline_orientation: Optional[bool] = None        # Use PPStructureV3 defaults
+    render_dpi: int = 200                                  # PDF page rasterization DPI (PyMuPDF)
     
     # Advanced Parameters (None = use defaults)
     text_det_thresh: Optional[float] = None
@@ -60,9 +66,11 @@ class Settings(BaseSettings):
     log_performance_metrics: bool = True         # Log performance and timing data
     log_debug_model_info: bool = True            # Log internal model information
     
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        frozen=True,
+    )
 
 def force_reload_config():
     """Force reload of configuration by clearing cached modules"""
@@ -79,10 +87,10 @@ def force_reload_config():
 
 def get_fresh_settings():
     """Get a fresh instance of settings, bypassing any caches"""
-    # Force reload this module
+    # Force reload this module (also resets the get_settings cache)
     current_module = sys.modules[__name__]
     importlib.reload(current_module)
-    return Settings()
+    return get_settings()
 
 def validate_and_log_config(settings_instance):
     """Validate configuration and log important settings"""
@@ -105,7 +113,12 @@ def validate_and_log_config(settings_instance):
     # Performance Settings
     print(f"[CONFIG] ⚡ Performance Settings:")
     print(f"[CONFIG]   🚀 High Performance Inference: {settings_instance.enable_hpi}")
+    print(f"[CONFIG]   🛟 HPI Fallback: {settings_instance.hpi_fallback}")
+    print(f"[CONFIG]   🧩 PaddleX Config: {settings_instance.paddlex_config or 'DEFAULT'}")
     print(f"[CONFIG]   💻 Device: {settings_instance.device}")
+    print(f"[CONFIG]   🧵 CPU Threads: {settings_instance.cpu_threads or 'DEFAULT'}")
+    print(f"[CONFIG]   👷 Pipeline Workers: {settings_instance.pipeline_workers}")
+    print(f"[CONFIG]   🖼️ Render DPI: {settings_instance.render_dpi}")
     
     # Logging Configuration
     print(f"[CONFIG] 📋 Logging Configuration:")
@@ -157,7 +170,8 @@ def get_pipeline_params(settings_instance):
         "use_doc_orientation_classify", "use_doc_unwarping", "use_textline_orientation",
         "text_det_thresh", "text_det_box_thresh", "text_det_unclip_ratio",
         "text_rec_score_thresh", "text_det_limit_side_len", "text_det_limit_type",
-        "text_recognition_batch_size", "layout_threshold", "layout_nms"
+        "text_recognition_batch_size", "layout_threshold", "layout_nms",
+        "cpu_threads", "paddlex_config"
     ]
     
     for param in optional_params:
@@ -167,13 +181,15 @@ def get_pipeline_params(settings_instance):
     
     return params
 
-# Create global settings instance
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Get the shared settings instance, created and validated on first use"""
+    settings_instance = Settings()
+    validate_and_log_config(settings_instance)
+    return settings_instance
 
-# Validate configuration on import
-validate_and_log_config(settings)
-
-# Create directories if they don't exist
-os.makedirs(settings.upload_dir, exist_ok=True)
-os.makedirs(settings.output_dir, exist_ok=True)
-os.makedirs("logs", exist_ok=True)
\ No newline at end of file
+def ensure_dirs(settings_instance):
+    """Create upload/output/log directories if they don't exist (call at startup)"""
+    os.makedirs(settings_instance.upload_dir, exist_ok=True)
+    os.makedirs(settings_instance.output_dir, exist_ok=True)
+    os.makedirs("logs", exist_ok=True)
@@ -4,11 +4,16 @@
 # Prasyarat: file schemas.py berisi kelas Pydantic yang sudah kamu kirim.
 
 from __future__ import annotations
+import os
 import re
-import json
 import time
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
+
+import orjson
+from pydantic import TypeAdapter
 
 # Import model pydantic kamu
 # Import pydantic models (support both "python -m app.services.data_extractor" and direct script run)
@@ -43,8 +48,21 @@ except ModuleNotFoundError:  # Fallback for direct invocation: python app/servic
         TelkomContractData,
     )
 
+# Validator TelkomContractData dibangun sekali per proses (dipakai merge_page2_file)
+_TELKOM_ADAPTER = TypeAdapter(TelkomContractData)
+
 # -------------------- Utilities --------------------
 _MONEY_TOKEN = re.compile(r"^\s*(?:Rp\.?|Rp)?\s*[\d\.\,]+\s*$", re.I)
+# Karakter awal yang mungkin untuk _MONEY_TOKEN (selain spasi / digit Unicode)
+_MONEY_START = frozenset("Rr.,0123456789")
+
+# Tabel str.translate untuk membuang karakter non-angka dalam satu pass C.
+# Hanya mencakup ASCII; token non-ASCII (jarang) tetap lewat regex agar
+# perilaku \d (digit Unicode) tidak berubah.
+_NUMERIC_ONLY = str.maketrans("", "", "".join(c for c in map(chr, range(128)) if c not in "0123456789,."))
+_DIGITS_ONLY = str.maketrans("", "", "".join(c for c in map(chr, range(128)) if c not in "0123456789"))
+_NON_NUMERIC_RE = re.compile(r"[^\d,\.]")
+_NON_DIGIT_RE = re.compile(r"[^\d]")
 
 def _texts_from_ocr(ocr_json: Any) -> List[str]:
     """
@@ -61,30 +79,63 @@ def _texts_from_ocr(ocr_json: Any) -> List[str]:
             return [str(t) for t in ocr_json["lines"]]
         if isinstance(ocr_json.get("text"), str):
             return [ln for ln in ocr_json["text"].splitlines()]
-    if isinstance(ocr_json, list):
+    if isinstance(ocr_json, (list, tuple)):
         return [str(t) for t in ocr_json]
     if isinstance(ocr_json, str):
         return ocr_json.splitlines()
     return []
 
-def _find_eq(texts: List[str], label: str, start: int = 0) -> Optional[int]:
+class _OcrPage:
+    """
+    Token OCR satu halaman + versi strip/lowercase + indeks posisi token.
+    Dibangun sekali per halaman, sehingga setiap lookup label exact-match
+    cukup satu dict lookup + bisect, dan pencarian keyword cukup satu
+    str.find di lower_blob (token lowercase digabung "\n") yang dipetakan
+    balik ke index token lewat offsets.
+    """
+
+    __slots__ = ("texts", "lower", "lower_blob", "positions", "offsets", "_joined")
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.lower = [t.strip().lower() for t in texts]
+        self.lower_blob = "\n".join(self.lower)
+        positions: Dict[str, List[int]] = {}
+        offsets: List[int] = []
+        pos = 0
+        for i, t in enumerate(self.lower):
+            positions.setdefault(t, []).append(i)
+            offsets.append(pos)
+            pos += len(t) + 1
+        self.positions = positions
+        self.offsets = offsets
+        self._joined: Optional[str] = None
+
+    @property
+    def joined(self) -> str:
+        """Seluruh token asli digabung spasi (dibuat sekali saat pertama dipakai)."""
+        if self._joined is None:
+            self._joined = " ".join(self.texts)
+        return self._joined
+
+def _find_eq(page: _OcrPage, label: str, start: int = 0) -> Optional[int]:
     """Cari index token yang sama persis (case-insensitive) dengan label."""
-    tgt = label.strip().lower()
-    for i in range(start, len(texts)):
-        if texts[i].strip().lower() == tgt:
-            return i
-    return None
+    hits = page.positions.get(label.strip().lower())
+    if not hits:
+        return None
+    k = bisect_left(hits, start)
+    return hits[k] if k < len(hits) else None
 
-def _value_after(texts: List[str], label: str, start: int = 0) -> Optional[str]:
+def _value_after(page: _OcrPage, label: str, start: int = 0) -> Optional[str]:
     """Ambil token setelah label tertentu (exact-match)."""
-    idx = _find_eq(texts, label, start)
-    if idx is not None and idx + 1 < len(texts):
-        return texts[idx + 1].strip()
+    idx = _find_eq(page, label, start)
+    if idx is not None and idx + 1 < len(page.texts):
+        return page.texts[idx + 1].strip()
     return None
 
 def _parse_rupiah_token(tok: str) -> float:
     """Konversi token rupiah 'Rp 1.234.567,89' -> 1234567.89 (float)."""
-    s = re.sub(r"[^\d,\.]", "", tok)
+    s = tok.translate(_NUMERIC_ONLY) if tok.isascii() else _NON_NUMERIC_RE.sub("", tok)
     if s.count(",") == 1 and s.count(".") >= 1:
         # Format ID: titik thousand, koma decimal
         s = s.replace(".", "").replace(",", ".")
@@ -98,51 +149,58 @@ def _parse_rupiah_token(tok: str) -> float:
 def _next_money(texts: List[str], start_idx: int) -> float:
     """Ambil token uang pada posisi sesudah start_idx."""
     for j in range(start_idx + 1, min(start_idx + 5, len(texts))):
-        if _MONEY_TOKEN.match(texts[j]):
-            return _parse_rupiah_token(texts[j])
+        t = texts[j]
+        # Tolak cepat token yang jelas bukan uang sebelum masuk regex
+        c = t[:1]
+        if not (c in _MONEY_START or c.isspace() or c.isdecimal()):
+            continue
+        if _MONEY_TOKEN.match(t):
+            return _parse_rupiah_token(t)
     # fallback: token persis setelahnya
     if start_idx + 1 < len(texts) and any(ch.isdigit() for ch in texts[start_idx + 1]):
         return _parse_rupiah_token(texts[start_idx + 1])
     return 0.0
 
-def _find_count_after_phrase(texts: List[str], phrase: str) -> int:
+def _find_count_after_phrase(page: _OcrPage, phrase: str) -> int:
     """Cari angka tepat setelah sebuah frasa (exact-match token)."""
-    idx = _find_eq(texts, phrase)
-    if idx is not None and idx + 1 < len(texts):
-        nxt = re.sub(r"[^\d]", "", texts[idx + 1])
+    idx = _find_eq(page, phrase)
+    if idx is not None and idx + 1 < len(page.texts):
+        tok = page.texts[idx + 1]
+        nxt = tok.translate(_DIGITS_ONLY) if tok.isascii() else _NON_DIGIT_RE.sub("", tok)
         if nxt.isdigit():
             return int(nxt)
     return 0
 
-def _slice_after_keyword(texts: List[str], keyword: str, span: int = 12) -> str:
+def _slice_after_keyword(page: _OcrPage, keyword: str, span: int = 12) -> str:
     """Gabung beberapa token setelah kata kunci (untuk raw_text simpanan)."""
-    # cari token yang mengandung keyword (case-insensitive)
-    for i, t in enumerate(texts):
-        if keyword.lower() in t.lower():
-            return " ".join(texts[i : min(i + span, len(texts))]).strip()
-    return ""
-
-def _get_payment_section_text(texts: List[str]) -> str:
+    # cari token pertama yang mengandung keyword (case-insensitive)
+    pos = page.lower_blob.find(keyword.lower())
+    if pos < 0:
+        return ""
+    i = bisect_right(page.offsets, pos) - 1
+    return " ".join(page.texts[i : min(i + span, len(page.texts))]).strip()
+
+def _get_payment_section_text(page: _OcrPage) -> tuple[str, bool]:
     """
     Ekstrak teks dari seksi pembayaran untuk analisis metode pembayaran.
     Prioritas: teks di sekitar header TATA CARA PEMBAYARAN, lalu fallback ke seluruh dokumen.
+
+    Returns:
+        tuple: (payment_text, from_tata_cara)
+        - from_tata_cara: True jika teks berasal dari header TATA CARA PEMBAYARAN
     """
     # Cari teks di sekitar header pembayaran dengan span lebih besar
-    payment_section = _slice_after_keyword(texts, "TATA CARA PEMBAYARAN", span=20)
+    payment_section = _slice_after_keyword(page, "TATA CARA PEMBAYARAN", span=20)
     if payment_section:
-        return payment_section
+        return payment_section, True
     
-    # Fallback: cari header pembayaran alternatif
-    payment_section = _slice_after_keyword(texts, "PEMBAYARAN", span=20)
-    if payment_section:
-        return payment_section
-        
-    payment_section = _slice_after_keyword(texts, "KETENTUAN PEMBAYARAN", span=20)
+    # Fallback: cari header pembayaran alternatif (juga mencakup "KETENTUAN PEMBAYARAN")
+    payment_section = _slice_after_keyword(page, "PEMBAYARAN", span=20)
     if payment_section:
-        return payment_section
+        return payment_section, False
     
     # Fallback terakhir: gabung seluruh teks dokumen
-    return " ".join(texts)
+    return page.joined, False
 
 def _normalize_payment_text(text: str) -> str:
     """
@@ -150,15 +208,53 @@ def _normalize_payment_text(text: str) -> str:
     """
     text = text.lower().strip()
     # Hapus spasi berlebih dan normalize
-    text = re.sub(r'\s+', ' ', text)
+    text = ' '.join(text.split())
     # Standardisasi singkatan bulan
     text = text.replace('/bln', ' per bulan')
     text = text.replace('bln', ' bulan')
     return text
 
-def _detect_payment_type(texts: List[str]) -> tuple[str, str, str]:
+# Pola deteksi metode pembayaran (dikompilasi sekali saat import)
+_ONE_TIME_RE = re.compile(r'\bone\s*time\s*charge\b', re.I)
+
+# Pattern untuk deteksi termin (prioritas tinggi - exclude dari recurring)
+_TERMIN_PATS = [
+    re.compile(r'\btermin[-\s]*\d+\b', re.I),           # Termin-1, Termin 1, etc.
+    re.compile(r'\btermin\s+(pertama|kedua|ketiga|keempat|kelima)\b', re.I),  # Termin pertama, dll
+]
+
+# Pattern untuk deteksi recurring (Indonesian + English), digabung jadi satu
+# alternation supaya cukup satu scan. "perbulan"/"per bulan" tercakup oleh
+# per\s*/?\s*bulan.
+_RECURRING_RE = re.compile(
+    r'\b(?:'
+    r'recurring'                        # Explicit "recurring"
+    r'|recurring\s*monthly'              # "recurring monthly"
+    r'|per\s*/?\s*bulan'                # "perbulan", "per bulan", "per/bulan"
+    r'|bulanan'                         # "bulanan"
+    r'|setiap\s*bulan'                  # "setiap bulan"
+    r'|pembayaran\s*bulanan'            # "pembayaran bulanan"
+    r'|tagihan\s*bulanan'               # "tagihan bulanan"
+    r'|langganan\s*bulanan'             # "langganan bulanan"
+    r'|monthly'                         # "monthly"
+    r'|billing\s*cycle\s*:\s*monthly'   # "billing cycle: monthly"
+    r')\b',
+    re.I,
+)
+
+_BULANAN_RE = re.compile(r'\bBULANAN\b', re.I)
+
+# Pattern untuk menangkap termin dengan berbagai format
+# Cocokkan bulan dan tahun, lalu kata kunci sebelum Rp
+_TERMIN_RE = re.compile(
+    r'Termin[-\s]*(\d+)[,\s]*yaitu\s+periode\s+(\w+\s*\d{4})\s*(?:sebesar\s*[:]*\s*)?[:]?\s*Rp\.?([\d\.,]+)',
+    re.IGNORECASE
+)
+
+def _detect_payment_type(page: _OcrPage, payment_text: str, from_tata_cara: bool) -> tuple[str, str, str]:
     """
     Deteksi metode pembayaran dari teks OCR.
+    payment_text / from_tata_cara: hasil _get_payment_section_text(page).
     
     Returns:
         tuple: (method_type, description, confidence)
@@ -166,109 +262,58 @@ def _detect_payment_type(texts: List[str]) -> tuple[str, str, str]:
         - description: Deskripsi metode pembayaran
         - confidence: "high", "medium", "low"
     """
-    # Ekstrak teks dari seksi pembayaran
-    payment_text = _get_payment_section_text(texts)
     normalized_text = _normalize_payment_text(payment_text)
     
-    # Pattern untuk deteksi termin (prioritas tinggi - exclude dari recurring)
-    termin_patterns = [
-        r'\btermin[-\s]*\d+\b',           # Termin-1, Termin 1, etc.
-        r'\btermin\s+(pertama|kedua|ketiga|keempat|kelima)\b',  # Termin pertama, dll
-    ]
-    
     # Cek eksplisit "One Time Charge" untuk prioritas tinggi
-    if re.search(r'\bone\s*time\s*charge\b', normalized_text, re.I):
+    if _ONE_TIME_RE.search(normalized_text):
         return "one_time_charge", "One Time Charge", "high"
     
     # Cek apakah ada pola termin
-    for pattern in termin_patterns:
-        if re.search(pattern, normalized_text, re.I):
+    for pattern in _TERMIN_PATS:
+        if pattern.search(normalized_text):
             # Deteksi termin sebagai method type tersendiri
             return "termin", "Pembayaran termin terdeteksi", "high"
     
-    # Pattern untuk deteksi recurring (Indonesian + English)
-    recurring_patterns = [
-        r'\brecurring\b',                          # Explicit "recurring"
-        r'\bperbulan\b|\bper\s*bulan\b',          # "perbulan", "per bulan"
-        r'\bbulanan\b',                           # "bulanan"
-        r'\bsetiap\s*bulan\b',                    # "setiap bulan"
-        r'\bpembayaran\s*bulanan\b',              # "pembayaran bulanan"
-        r'\btagihan\s*bulanan\b',                 # "tagihan bulanan"
-        r'\blangganan\s*bulanan\b',               # "langganan bulanan"
-        r'\bmonthly\b',                           # "monthly"
-        r'\brecurring\s*monthly\b',               # "recurring monthly"
-        r'\bbilling\s*cycle\s*:\s*monthly\b',     # "billing cycle: monthly"
-        r'\bper\s*/?\s*bulan\b',                  # "per/bulan"
-    ]
-    
-    # Cari pola recurring dalam teks seksi pembayaran (confidence tinggi)
-    payment_section_only = _slice_after_keyword(texts, "TATA CARA PEMBAYARAN", span=20)
-    if payment_section_only:
-        normalized_section = _normalize_payment_text(payment_section_only)
-        for pattern in recurring_patterns:
-            match = re.search(pattern, normalized_section, re.I)
-            if match:
-                matched_phrase = match.group(0)
-                return "recurring", f"Pembayaran bulanan terdeteksi (frasa: '{matched_phrase}')", "high"
-    
-    # Cari pola recurring di seluruh dokumen (confidence medium)
-    for pattern in recurring_patterns:
-        match = re.search(pattern, normalized_text, re.I)
-        if match:
-            matched_phrase = match.group(0)
-            return "recurring", f"Pembayaran bulanan terdeteksi (frasa: '{matched_phrase}')", "medium"
+    # Cari pola recurring: confidence tinggi bila teks berasal dari seksi
+    # TATA CARA PEMBAYARAN, medium bila dari header lain / seluruh dokumen
+    match = _RECURRING_RE.search(normalized_text)
+    if match:
+        matched_phrase = match.group(0)
+        confidence = "high" if from_tata_cara else "medium"
+        return "recurring", f"Pembayaran bulanan terdeteksi (frasa: '{matched_phrase}')", confidence
     
     # Cek keberadaan header tabel "BULANAN" sebagai indikator recurring
     # Tapi hanya jika tidak ada indikator One Time Charge yang eksplisit
-    full_text = " ".join(texts)
-    if re.search(r'\bBULANAN\b', full_text, re.I):
+    # (lower_blob cukup: pola case-insensitive dan batas kata tidak berubah)
+    if _BULANAN_RE.search(page.lower_blob):
         return "recurring", "Pembayaran bulanan terdeteksi (tabel biaya bulanan)", "medium"
     
     # Default: tidak dapat menentukan, assume one_time_charge untuk backward compatibility
     return "one_time_charge", "Metode pembayaran tidak terdeteksi", "low"
 
-def _extract_termin_payments(texts: List[str]) -> tuple[List[TerminPayment], int, float]:
+def _extract_termin_payments(payment_text: str) -> tuple[List[TerminPayment], int, float]:
     """
-    Ekstrak daftar pembayaran termin dari teks OCR.
+    Ekstrak daftar pembayaran termin dari teks seksi pembayaran
+    (hasil _get_payment_section_text).
     
     Returns:
         tuple: (termin_list, total_count, total_amount)
     """
-    # Cari teks dari seksi pembayaran
-    payment_text = _get_payment_section_text(texts)
-    
-    # Pattern untuk menangkap termin dengan berbagai format
-    # Cocokkan bulan dan tahun, lalu kata kunci sebelum Rp
-    termin_pattern = re.compile(
-        r'Termin[-\s]*(\d+)[,\s]*yaitu\s+periode\s+(\w+\s*\d{4})\s*(?:sebesar\s*[:]*\s*)?[:]?\s*Rp\.?([\d\.,]+)',
-        re.IGNORECASE
-    )
-    
     termin_payments = []
     total_amount = 0.0
     
-    # Cari semua matches dalam teks
-    matches = termin_pattern.findall(payment_text)
-    
-    for match in matches:
+    # Iterasi match langsung; group(0) sekaligus menjadi raw text untuk debugging
+    for m in _TERMIN_RE.finditer(payment_text):
         try:
-            termin_num = int(match[0])
-            period = match[1].strip()
-            amount_str = match[2].strip()
-            
-            # Bersihkan amount string dari karakter trailing
-            amount_str = re.sub(r'[^\d\.,]', '', amount_str)
+            termin_num = int(m.group(1))
+            period = m.group(2).strip()
+            # group(3) sudah hanya berisi digit/titik/koma
+            amount_str = m.group(3)
             # Parse amount dengan handling format Indonesia (titik sebagai thousand separator, koma sebagai decimal)
             amount = _parse_rupiah_token("Rp " + amount_str)
+            raw_text = m.group(0)
             
-            # Buat raw text untuk debugging
-            raw_match = re.search(
-                rf'Termin[-\s]*{termin_num}[^R]*?[Rp\.\s]*{re.escape(amount_str)}[,\.]?',
-                payment_text, re.IGNORECASE
-            )
-            raw_text = raw_match.group(0) if raw_match else f"Termin-{termin_num} {period} {amount_str}"
-            
-            termin_payment = TerminPayment(
+            termin_payment = TerminPayment.model_construct(
                 termin_number=termin_num,
                 period=period,
                 amount=amount,
@@ -300,6 +345,7 @@ def extract_from_page1_one_time(ocr_json_page1: Any) -> TelkomContractData:
     """
     t0 = time.time()
     texts = _texts_from_ocr(ocr_json_page1)
+    page = _OcrPage(texts)
 
     # --- Informasi Pelanggan ---
     # Heuristik: cari blok "2.PELANGGAN" lalu ambil "Nama", "Alamat", "NPWP" setelahnya
@@ -314,9 +360,9 @@ def extract_from_page1_one_time(ocr_json_page1: Any) -> TelkomContractData:
             break
 
     if idx_pelanggan is not None:
-        nama_pelanggan = _value_after(texts, "Nama", start=idx_pelanggan) or nama_pelanggan
-        alamat = _value_after(texts, "Alamat", start=idx_pelanggan) or alamat
-        npwp = _value_after(texts, "NPWP", start=idx_pelanggan) or npwp
+        nama_pelanggan = _value_after(page, "Nama", start=idx_pelanggan) or nama_pelanggan
+        alamat = _value_after(page, "Alamat", start=idx_pelanggan) or alamat
+        npwp = _value_after(page, "NPWP", start=idx_pelanggan) or npwp
 
         # Jika di page 1 ada "Diwakili secara sah oleh:" untuk pelanggan → isi perwakilan
         # (Kalau tidak ada, biarkan None)
@@ -327,23 +373,25 @@ def extract_from_page1_one_time(ocr_json_page1: Any) -> TelkomContractData:
                 idx_rep = j
                 break
         if idx_rep is not None:
-            perwakilan_nama = _value_after(texts, "Nama", start=idx_rep) or perwakilan_nama
-            perwakilan_jabatan = _value_after(texts, "Jabatan", start=idx_rep) or perwakilan_jabatan
+            perwakilan_nama = _value_after(page, "Nama", start=idx_rep) or perwakilan_nama
+            perwakilan_jabatan = _value_after(page, "Jabatan", start=idx_rep) or perwakilan_jabatan
 
-    informasi_pelanggan = InformasiPelanggan(
+    # Semua nilai di bawah dihasilkan ekstraktor sendiri (bukan input user),
+    # jadi model dirakit via model_construct tanpa validasi ulang.
+    informasi_pelanggan = InformasiPelanggan.model_construct(
         nama_pelanggan=nama_pelanggan,
         alamat=alamat,
         npwp=npwp,
-        perwakilan=Perwakilan(nama=perwakilan_nama, jabatan=perwakilan_jabatan) if (perwakilan_nama or perwakilan_jabatan) else None,
+        perwakilan=Perwakilan.model_construct(nama=perwakilan_nama, jabatan=perwakilan_jabatan) if (perwakilan_nama or perwakilan_jabatan) else None,
         kontak_person=None,  # placeholder (ada di Page 2)
     )
 
     # --- Layanan Utama (counts) ---
-    connectivity = _find_count_after_phrase(texts, "Layanan Connectivity TELKOM")
-    non_connectivity = _find_count_after_phrase(texts, "Layanan Non-Connectivity TELKOM")
+    connectivity = _find_count_after_phrase(page, "Layanan Connectivity TELKOM")
+    non_connectivity = _find_count_after_phrase(page, "Layanan Non-Connectivity TELKOM")
     # Jika bundling tidak muncul dengan angka di halaman 1 → set 0
-    bundling = _find_count_after_phrase(texts, "Bundling Layanan Connectivity TELKOM& Solusi")
-    layanan_utama = LayananUtama(
+    bundling = _find_count_after_phrase(page, "Bundling Layanan Connectivity TELKOM& Solusi")
+    layanan_utama = LayananUtama.model_construct(
         connectivity_telkom=connectivity,
         non_connectivity_telkom=non_connectivity,
         bundling=bundling or 0,
@@ -353,16 +401,16 @@ def extract_from_page1_one_time(ocr_json_page1: Any) -> TelkomContractData:
     biaya_instalasi = 0.0
     biaya_langganan_tahunan = 0.0
 
-    idx_bi_inst = _find_eq(texts, "Biaya Instalasi")
+    idx_bi_inst = _find_eq(page, "Biaya Instalasi")
     if idx_bi_inst is not None:
         biaya_instalasi = _next_money(texts, idx_bi_inst)
 
-    idx_bi_lang_tahun = _find_eq(texts, "Biaya Langganan Tahunan")
+    idx_bi_lang_tahun = _find_eq(page, "Biaya Langganan Tahunan")
     if idx_bi_lang_tahun is not None:
         biaya_langganan_tahunan = _next_money(texts, idx_bi_lang_tahun)
 
     rincian_layanan = [
-        RincianLayanan(
+        RincianLayanan.model_construct(
             biaya_instalasi=biaya_instalasi,
             biaya_langganan_tahunan=biaya_langganan_tahunan,
             tata_cara_pembayaran=None,  # di level utama kita isi di bawah
@@ -370,10 +418,11 @@ def extract_from_page1_one_time(ocr_json_page1: Any) -> TelkomContractData:
     ]
 
     # --- Tata Cara Pembayaran (Dynamic Detection) ---
-    raw_tata = _slice_after_keyword(texts, "TATA CARA PEMBAYARAN", span=16)
+    raw_tata = _slice_after_keyword(page, "TATA CARA PEMBAYARAN", span=16)
     
-    # Deteksi metode pembayaran secara dinamis
-    method_type, description, confidence = _detect_payment_type(texts)
+    # Deteksi metode pembayaran secara dinamis (seksi pembayaran dicari sekali)
+    payment_text, from_tata_cara = _get_payment_section_text(page)
+    method_type, description, confidence = _detect_payment_type(page, payment_text, from_tata_cara)
     
     # Jika termin, ekstrak detail pembayaran termin
     termin_payments = None
@@ -381,7 +430,7 @@ def extract_from_page1_one_time(ocr_json_page1: Any) -> TelkomContractData:
     total_amount = None
     
     if method_type == "termin":
-        termin_list, count, amount = _extract_termin_payments(texts)
+        termin_list, count, amount = _extract_termin_payments(payment_text)
         if termin_list:  # Jika berhasil ekstrak termin
             termin_payments = termin_list
             total_termin_count = count
@@ -392,7 +441,7 @@ def extract_from_page1_one_time(ocr_json_page1: Any) -> TelkomContractData:
             method_type = "one_time_charge"
             description = "Pembayaran termin terdeteksi (gagal ekstrak detail)"
     
-    tata_cara_pembayaran = TataCaraPembayaran(
+    tata_cara_pembayaran = TataCaraPembayaran.model_construct(
         method_type=method_type,
         description=description,
         termin_payments=termin_payments,
@@ -402,14 +451,14 @@ def extract_from_page1_one_time(ocr_json_page1: Any) -> TelkomContractData:
     )
 
     # --- Kontak Person Telkom (placeholder; ada di Page 2) ---
-    kontak_person_telkom = KontakPersonTelkom(
+    kontak_person_telkom = KontakPersonTelkom.model_construct(
         nama=None, jabatan=None, email=None, telepon=None
     )
 
     # --- Jangka Waktu (placeholder; ada di Page 2) ---
-    jangka_waktu = JangkaWaktu(mulai=None, akhir=None)
+    jangka_waktu = JangkaWaktu.model_construct(mulai=None, akhir=None)
 
-    data = TelkomContractData(
+    data = TelkomContractData.model_construct(
         informasi_pelanggan=informasi_pelanggan,
         layanan_utama=layanan_utama,
         rincian_layanan=rincian_layanan,
@@ -438,78 +487,96 @@ _ID_MONTHS = {
     "des": 12, "desember": 12,
 }
 
+# Semua format tanggal dalam satu regex; cabang yang cocok dibaca dari m.lastgroup.
+# Format "DDMonthYYYY" sudah tercakup oleh cabang "loose" (spasi opsional).
+_DATE_RE = re.compile(
+    r"\b(?:"
+    r"(?P<iso>(?P<iso_y>20\d{2}|19\d{2})-(?P<iso_m>\d{1,2})-(?P<iso_d>\d{1,2}))"  # YYYY-MM-DD
+    r"|(?P<dmy>(?P<dmy_d>\d{1,2})[\/\-](?P<dmy_m>\d{1,2})[\/\-](?P<dmy_y>20\d{2}|19\d{2}))"  # DD[-/]MM[-/]YYYY
+    r"|(?P<named>(?P<named_d>\d{1,2})\s+(?P<named_m>[A-Za-z\.]+)\s+(?P<named_y>20\d{2}|19\d{2}))"  # D Month YYYY
+    r"|(?P<loose>(?P<loose_d>\d{1,2})\s*(?P<loose_m>[A-Za-z]+)(?P<loose_y>\d{4}))"  # 01Januari2025 / 31 Desember2025
+    r")\b"
+)
+
 def _to_iso_date(y: int, m: int, d: int) -> Optional[str]:
     try:
         return f"{int(y):04d}-{int(m):02d}-{int(d):02d}"
     except Exception:
         return None
 
+def _date_from_match(m: "re.Match[str]") -> Optional[str]:
+    kind = m.lastgroup
+    if kind == "iso":
+        return _to_iso_date(m.group("iso_y"), m.group("iso_m"), m.group("iso_d"))
+    if kind == "dmy":
+        return _to_iso_date(m.group("dmy_y"), m.group("dmy_m"), m.group("dmy_d"))
+    mon = _ID_MONTHS.get(m.group(kind + "_m").lower().strip("."))
+    if mon is None:
+        return None
+    return _to_iso_date(m.group(kind + "_y"), mon, m.group(kind + "_d"))
+
+def _iter_dates(s: str) -> Iterator[str]:
+    """
+    Semua tanggal valid di s, urut dari kiri. Match dengan nama bulan tak dikenal
+    (mis. "1 Tahun 2025") dicoba ulang dari m.start() + 1, bukan dari m.end(),
+    supaya tanggal yang tumpang-tindih dengannya ("2025-01-05") tidak terlewat.
+    """
+    m = _DATE_RE.search(s)
+    while m:
+        d = _date_from_match(m)
+        if d:
+            yield d
+            m = _DATE_RE.search(s, m.end())
+        else:
+            m = _DATE_RE.search(s, m.start() + 1)
+
 def _parse_date_id(s: str) -> Optional[str]:
-    s = s.strip()
-    # ISO: YYYY-MM-DD
-    m = re.search(r"\b(20\d{2}|19\d{2})-(\d{1,2})-(\d{1,2})\b", s)
-    if m:
-        return _to_iso_date(m.group(1), m.group(2), m.group(3))
-    # DD[-/]MM[-/]YYYY
-    m = re.search(r"\b(\d{1,2})[\/\-](\d{1,2})[\/\-](20\d{2}|19\d{2})\b", s)
-    if m:
-        d, mo, y = int(m.group(1)), int(m.group(2)), int(m.group(3))
-        return _to_iso_date(y, mo, d)
-    # D Month YYYY (Indonesia) with spaces
-    m = re.search(r"\b(\d{1,2})\s+([A-Za-z\.]+)\s+(20\d{2}|19\d{2})\b", s)
-    if m:
-        d = int(m.group(1))
-        mon = m.group(2).lower().strip(".")
-        y = int(m.group(3))
-        if mon in _ID_MONTHS:
-            return _to_iso_date(y, _ID_MONTHS[mon], d)
-    # Concatenated format: DDMonthYYYY (e.g., "01Januari2025", "31Desember2025")
-    m = re.search(r"\b(\d{1,2})([A-Za-z]+)(\d{4})\b", s)
-    if m:
-        d = int(m.group(1))
-        mon = m.group(2).lower()
-        y = int(m.group(3))
-        if mon in _ID_MONTHS:
-            return _to_iso_date(y, _ID_MONTHS[mon], d)
-    # Format with optional spaces: DD [space] Month YYYY (e.g., "31 Desember2025")
-    m = re.search(r"\b(\d{1,2})\s*([A-Za-z]+)(\d{4})\b", s)
-    if m:
-        d = int(m.group(1))
-        mon = m.group(2).lower()
-        y = int(m.group(3))
-        if mon in _ID_MONTHS:
-            return _to_iso_date(y, _ID_MONTHS[mon], d)
-    return None
+    # Tanggal valid pertama (paling kiri)
+    return next(_iter_dates(s), None)
 
 # -------------------- Page 2: robust jangka waktu + kontak --------------------
 def _blob(texts: List[str]) -> str:
     return "\n".join(texts)
 
+_LABEL_STRIP = str.maketrans("", "", "*():")
+_LABEL_ALIASES = {"telepon/gsm": "telepon", "e-mail": "email"}
+_LABEL_ALIAS_RE = re.compile("|".join(map(re.escape, _LABEL_ALIASES)))
+
 def _norm_label(s: str) -> str:
-    s = s.lower().strip()
-    s = s.replace("*", "").replace(")", "").replace("(", "")
-    s = s.replace(":", "")
-    s = s.replace("telepon/gsm", "telepon")
-    s = s.replace("e-mail", "email").replace("email", "email")
+    s = _LABEL_ALIAS_RE.sub(lambda m: _LABEL_ALIASES[m.group(0)], s.lower().translate(_LABEL_STRIP))
     return s.strip()  # Final strip to remove any trailing spaces
 
 _EMAIL_RE = re.compile(r"[\w\.-]+@[\w\.-]+\.\w+", re.I)
 _PHONE_RE = re.compile(r"(?:\+62|0)[\d\-\s]{7,20}", re.I)
 
+# "berlaku sejak tanggal X hingga Y"
+_JANGKA_RE = re.compile(
+    r"berlaku\s+sejak\s*tanggal?\s+(.+?)\s+(?:hingga|sampai(?:\s+dengan)?)\s+(.+?)(?:\s|$)",
+    re.I,
+)
+# Tanggal tanpa spasi, mis. "01Januari2025 sampai dengan31 Desember2025"
+_JANGKA_CONCAT_RE = re.compile(
+    r"berlaku\s+sejak[^0-9]*(\d{1,2}[A-Za-z]+\d{4})\s*(?:sampai\s+dengan|hingga)\s*(\d{1,2}\s*[A-Za-z]+\s*\d{4})",
+    re.I,
+)
+
+_CONTACT_LABELS = frozenset({"nama", "jabatan", "telepon", "email"})
+
 def _is_email(tok: str) -> bool:
-    return bool(_EMAIL_RE.fullmatch(tok.strip()))
+    t = tok.strip()
+    # Tanpa '@' pasti bukan email → regex tidak perlu dijalankan
+    return "@" in t and _EMAIL_RE.fullmatch(t) is not None
 
 def _is_phone(tok: str) -> bool:
-    return bool(_PHONE_RE.fullmatch(tok.strip()))
+    t = tok.strip()
+    # Nomor selalu diawali "+62" atau "0"
+    return t[:1] in ("+", "0") and _PHONE_RE.fullmatch(t) is not None
 
 def _extract_jangka_waktu(texts: List[str]) -> tuple[Optional[str], Optional[str]]:
     b = _blob(texts)
-    
+
     # Pattern 1: "berlaku sejak tanggal X hingga Y"
-    m = re.search(
-        r"berlaku\s+sejak\s*tanggal?\s+(.+?)\s+(?:hingga|sampai(?:\s+dengan)?)\s+(.+?)(?:\s|$)",
-        b, flags=re.I
-    )
+    m = _JANGKA_RE.search(b)
     if m:
         start = _parse_date_id(m.group(1))
         end = _parse_date_id(m.group(2))
@@ -517,22 +584,18 @@ def _extract_jangka_waktu(texts: List[str]) -> tuple[Optional[str], Optional[str
             return start, end
     
     # Pattern 2: Handle concatenated dates like "01Januari2025 sampai dengan31 Desember2025"
-    m = re.search(
-        r"berlaku\s+sejak[^0-9]*(\d{1,2}[A-Za-z]+\d{4})\s*(?:sampai\s+dengan|hingga)\s*(\d{1,2}\s*[A-Za-z]+\s*\d{4})",
-        b, flags=re.I
-    )
+    m = _JANGKA_CONCAT_RE.search(b)
     if m:
         start = _parse_date_id(m.group(1))
         end = _parse_date_id(m.group(2))
         if start and end:  # Only return if both dates are successfully parsed
             return start, end
     
-    # Fallback: ambil 2 tanggal pertama apapun formatnya
+    # Fallback: ambil 2 tanggal pertama apapun formatnya, satu finditer untuk seluruh halaman.
+    # Pemisah "\x00" (bukan spasi / huruf / angka) mencegah tanggal terbentuk lintas token.
     candidates = []
-    for tok in texts:
-        d = _parse_date_id(tok)
-        if d:
-            candidates.append(d)
+    for d in _iter_dates("\x00".join(texts)):
+        candidates.append(d)
         if len(candidates) >= 2:
             break
     if len(candidates) >= 2:
@@ -560,19 +623,20 @@ def _extract_contact_blocks(texts: List[str]) -> tuple[Dict[str, str], Dict[str,
     except ValueError:
         telkom_anchor = 0  # kalau tidak ada, mulai dari awal sub
     telkom_tokens = sub[telkom_anchor : ]
+    # Label dinormalisasi sekali untuk seluruh jendela, bukan per iterasi read_contact
+    telkom_norm = [_norm_label(t) for t in telkom_tokens]
 
     # Setelah telkom block, akan ada label "Nama" lagi untuk PELANGGAN
     # Strategi: ekstrak 2 contact berturut-turut menggunakan parser label→nilai
-    def read_contact(seq: List[str]) -> tuple[Dict[str, str], int]:
+    def read_contact(seq: List[str], seq_norm: List[str]) -> tuple[Dict[str, str], int]:
         fields = {"nama": None, "jabatan": None, "telepon": None, "email": None}
-        labels = {"nama", "jabatan", "telepon", "email"}
         i = 0
         last_label = None
         hits = 0
         while i < len(seq):
             tok_raw = seq[i].strip()
-            tok = _norm_label(tok_raw)
-            if tok in labels:
+            tok = seq_norm[i]
+            if tok in _CONTACT_LABELS:
                 # Heuristik switch: jika muncul "Nama" baru DAN sudah ada minimal 2 field → akhir blok
                 if tok == "nama" and sum(1 for v in fields.values() if v) >= 2:
                     break
@@ -621,11 +685,11 @@ def _extract_contact_blocks(texts: List[str]) -> tuple[Dict[str, str], Dict[str,
 
         return fields, i
 
-    telkom_fields, consumed = read_contact(telkom_tokens)
+    telkom_fields, consumed = read_contact(telkom_tokens, telkom_norm)
 
     # PELANGGAN mulai setelah tokens yang telah dibaca
     pelanggan_tokens = telkom_tokens[consumed:]
-    pelanggan_fields, _ = read_contact(pelanggan_tokens)
+    pelanggan_fields, _ = read_contact(pelanggan_tokens, telkom_norm[consumed:])
 
     # Bersihkan nilai kosong
     telkom_fields = {k: v for k, v in telkom_fields.items() if v}
@@ -634,12 +698,13 @@ def _extract_contact_blocks(texts: List[str]) -> tuple[Dict[str, str], Dict[str,
 
 # -------------------- Page 2 Merge --------------------
 def merge_with_page2(existing: TelkomContractData, ocr_json_page2: Any) -> TelkomContractData:
+    # Nilai kontak/tanggal berasal dari parser sendiri → model dirakit via model_construct.
     texts = _texts_from_ocr(ocr_json_page2)
 
     # 1) Jangka waktu
     start_date, end_date = _extract_jangka_waktu(texts)
     if existing.jangka_waktu is None:
-        existing.jangka_waktu = JangkaWaktu()
+        existing.jangka_waktu = JangkaWaktu.model_construct()
     if start_date:
         existing.jangka_waktu.mulai = existing.jangka_waktu.mulai or start_date
     if end_date:
@@ -650,7 +715,7 @@ def merge_with_page2(existing: TelkomContractData, ocr_json_page2: Any) -> Telko
 
     # Isi TELKOM
     if any(telkom.values()):
-        existing.kontak_person_telkom = KontakPersonTelkom(
+        existing.kontak_person_telkom = KontakPersonTelkom.model_construct(
             nama=telkom.get("nama"),
             jabatan=telkom.get("jabatan"),
             email=telkom.get("email"),
@@ -659,9 +724,9 @@ def merge_with_page2(existing: TelkomContractData, ocr_json_page2: Any) -> Telko
 
     # Isi PELANGGAN
     if existing.informasi_pelanggan is None:
-        existing.informasi_pelanggan = InformasiPelanggan()
+        existing.informasi_pelanggan = InformasiPelanggan.model_construct()
     if any(pelanggan.values()):
-        existing.informasi_pelanggan.kontak_person = KontakPersonPelanggan(
+        existing.informasi_pelanggan.kontak_person = KontakPersonPelanggan.model_construct(
             nama=pelanggan.get("nama"),
             jabatan=pelanggan.get("jabatan"),
             email=pelanggan.get("email"),
@@ -672,11 +737,31 @@ def merge_with_page2(existing: TelkomContractData, ocr_json_page2: Any) -> Telko
 
 
 # -------------------- Convenience I/O --------------------
+def _load_json(path: str) -> Any:
+    """Baca file JSON sebagai bytes dan parse dengan orjson (tanpa decode str dulu)."""
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
+
+def _dump_json(obj: Any) -> bytes:
+    """Serialize ke JSON UTF-8 (indent 2, non-ASCII apa adanya) dengan orjson."""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+@lru_cache(maxsize=64)
+def _load_ocr_texts_cached(path: str, mtime_ns: int, size: int) -> tuple:
+    return tuple(_texts_from_ocr(_load_json(path)))
+
+def _load_ocr_texts(path: str) -> tuple:
+    """
+    Token OCR dari file JSON, di-cache per (path, mtime, size) supaya ekstraksi
+    ulang dokumen yang sama tidak mem-parse JSON lagi. Hanya token (tuple,
+    immutable) yang disimpan, bukan seluruh dict OCR.
+    """
+    st = os.stat(path)
+    return _load_ocr_texts_cached(path, st.st_mtime_ns, st.st_size)
+
 def extract_page1_file(input_json_path: str) -> Dict[str, Any]:
     """Baca file JSON OCR page 1 dan kembalikan dict hasil model_dump()."""
-    with open(input_json_path, "r", encoding="utf-8") as f:
-        ocr = json.load(f)
-    data = extract_from_page1_one_time(ocr)
+    data = extract_from_page1_one_time(_load_ocr_texts(input_json_path))
     # mode="json" memastikan field datetime / non-JSON-native sudah di-serialize (ISO string)
     return data.model_dump(mode="json")
 
@@ -685,21 +770,17 @@ def merge_page2_file(existing_json_path: str, page2_json_path: str, output_json_
     Baca hasil existing (file JSON TelkomContractData) + OCR page 2,
     lakukan merge, lalu simpan (opsional) & kembalikan dict.
     """
-    with open(existing_json_path, "r", encoding="utf-8") as f:
-        existing_dict = json.load(f)
-    # Rekonstruksi model dari dict (jika perlu)
-    existing = TelkomContractData(**existing_dict)
-
-    with open(page2_json_path, "r", encoding="utf-8") as f:
-        ocr2 = json.load(f)
+    existing_dict = _load_json(existing_json_path)
+    # Rekonstruksi model dari dict (validasi penuh: file berasal dari luar proses)
+    existing = _TELKOM_ADAPTER.validate_python(existing_dict)
 
-    merged = merge_with_page2(existing, ocr2)
+    merged = merge_with_page2(existing, _load_ocr_texts(page2_json_path))
     # Serialize to JSON-friendly structure
     result = merged.model_dump(mode="json")
 
     if output_json_path:
-        with open(output_json_path, "w", encoding="utf-8") as f:
-            json.dump(result, f, ensure_ascii=False, indent=2)
+        with open(output_json_path, "wb") as f:
+            f.write(_dump_json(result))
 
     return result
 
@@ -724,10 +805,10 @@ if __name__ == "__main__":
     if args.cmd == "page1":
         res = extract_page1_file(args.inp)
         if args.out:
-            with open(args.out, "w", encoding="utf-8") as f:
-                json.dump(res, f, ensure_ascii=False, indent=2)
+            with open(args.out, "wb") as f:
+                f.write(_dump_json(res))
         else:
-            json.dump(res, sys.stdout, ensure_ascii=False, indent=2)
+            sys.stdout.buffer.write(_dump_json(res))
     elif args.cmd == "merge2":
         res = merge_page2_file(args.existing, args.page2, args.out)
         # file sudah disimpan; tampilkan ringkas ke stdout
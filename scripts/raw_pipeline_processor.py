@@ -3,62 +3,58 @@
 Pipeline Processor for Telkom Contract Documents
 
 Based on the working example, this script processes PDF contract files using 
-PP-StructureV3 pipeline and saves the raw JSON results using the built-in
-save_to_json() method.
+PP-StructureV3 pipeline and saves the raw JSON results with orjson
+(_save_result_json).
 
 Usage:
     python scripts/pipeline_processor.py
 """
 
 import os
+import re
 import sys
 import time
-import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 from statistics import mean
 
 # Add the app directory to Python path for config
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 import fitz  # PyMuPDF
+import numpy as np
+import orjson
 from loguru import logger
 from paddleocr import PPStructureV3
-from pdf2image import convert_from_path
+from paddlex.utils.deps import DependencyError
 
-from app.config import settings, get_pipeline_params
+from app.config import get_settings, get_pipeline_params, ensure_dirs
 
 
 class PipelineProcessor:
     """PP-StructureV3 pipeline processor using the working blueprint"""
     
-    def __init__(self):
+    def __init__(self, settings=None):
+        # Workers get the parent's settings, so they skip re-validation and the [CONFIG] banner
+        self.settings = settings or get_settings()
         self.pipeline = None
-        self.temp_dir = None
-        self._setup_temp_dir()
         self._initialize_pipeline()
     
-    def _setup_temp_dir(self):
-        """Create temporary directory for processing"""
-        try:
-            self.temp_dir = tempfile.mkdtemp(prefix="telkom_pipeline_")
-            logger.info(f"Temporary directory created: {self.temp_dir}")
-        except Exception as e:
-            logger.error(f"Failed to create temp directory: {str(e)}")
-            raise
-    
     def _initialize_pipeline(self):
         """Initialize PP-StructureV3 pipeline using centralized configuration"""
         try:
-            if settings.log_config_details:
+            if self.settings.log_config_details:
                 logger.info("="*80)
                 logger.info("🏭 INITIALIZING PP-STRUCTUREV3 PIPELINE")
                 logger.info("="*80)
             
             # Get pipeline parameters from centralized config
-            pipeline_params = get_pipeline_params(settings)
+            pipeline_params = get_pipeline_params(self.settings)
             
-            if settings.log_model_loading:
+            if self.settings.log_model_loading:
                 logger.info("📋 Pipeline Parameters from Config:")
                 for key, value in pipeline_params.items():
                     logger.info(f"   {key}: {value}")
@@ -71,16 +67,23 @@ class PipelineProcessor:
             
             t_load_start = time.perf_counter()
             
-            if settings.log_model_loading:
+            if self.settings.log_model_loading:
                 logger.info("🔄 Creating PPStructureV3 pipeline...")
             
             # Initialize pipeline with centralized config
-            self.pipeline = PPStructureV3(**pipeline_params)
+            try:
+                self.pipeline = PPStructureV3(**pipeline_params)
+            except (DependencyError, ImportError) as e:
+                # Only a missing HPI plugin, and only when explicitly allowed (hpi_fallback)
+                if not (pipeline_params["enable_hpi"] and self.settings.hpi_fallback):
+                    raise
+                logger.error(f"❌ HPI plugin unavailable ({str(e)}); HPI_FALLBACK set, retrying WITHOUT HPI")
+                self.pipeline = PPStructureV3(**{**pipeline_params, "enable_hpi": False})
             
             t_load_end = time.perf_counter()
             t_load = t_load_end - t_load_start
             
-            if settings.log_performance_metrics:
+            if self.settings.log_performance_metrics:
                 logger.info("="*80)
                 logger.info("✅ PIPELINE INITIALIZATION COMPLETE")
                 logger.info("="*80)
@@ -92,7 +95,7 @@ class PipelineProcessor:
                 logger.info(f"Pipeline initialized (load time: {t_load:.3f}s)")
             
             # Log model verification if enabled
-            if settings.log_debug_model_info:
+            if self.settings.log_debug_model_info:
                 self._log_model_verification()
                 
         except Exception as e:
@@ -132,67 +135,54 @@ class PipelineProcessor:
             logger.warning(f"⚠️  Could not verify models: {str(e)}")
             logger.warning("   This is not critical - pipeline should still work")
     
-    def cut_pdf_to_first_two_pages(self, input_path: str, output_path: str) -> bool:
-        """Cut PDF to first 2 pages using PyMuPDF"""
-        try:
-            logger.info(f"Cutting PDF to first 2 pages: {os.path.basename(input_path)}")
-            
-            pdf_document = fitz.open(input_path)
-            
-            if len(pdf_document) == 0:
-                logger.warning(f"PDF has no pages: {input_path}")
-                return False
-            
-            # Create new PDF with first 2 pages
-            pages_to_extract = min(2, len(pdf_document))
-            new_pdf = fitz.open()
-            
-            for page_num in range(pages_to_extract):
-                new_pdf.insert_pdf(pdf_document, from_page=page_num, to_page=page_num)
-            
-            new_pdf.save(output_path)
-            new_pdf.close()
-            pdf_document.close()
-            
-            logger.info(f"PDF cut completed. Pages extracted: {pages_to_extract}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error cutting PDF {input_path}: {str(e)}")
-            return False
-    
-    def pdf_to_images(self, pdf_path: str, dpi: int = 200) -> list:
-        """Convert PDF to images using pdf2image"""
+    def pdf_to_images(self, pdf_path: str, dpi: Optional[int] = None, max_pages: int = 2) -> list:
+        """Render the first `max_pages` PDF pages in-process with PyMuPDF into BGR numpy arrays"""
         try:
-            logger.info(f"Converting PDF to images @ {dpi} DPI: {os.path.basename(pdf_path)}")
+            dpi = dpi or self.settings.render_dpi
+            logger.info(f"Rendering first {max_pages} PDF pages @ {dpi} DPI: {os.path.basename(pdf_path)}")
             t_pdf_start = time.perf_counter()
             
-            # Convert PDF to images
-            pages = convert_from_path(pdf_path, dpi=dpi)
+            images = []
+            with fitz.open(pdf_path) as pdf_document:
+                if len(pdf_document) == 0:
+                    logger.warning(f"PDF has no pages: {pdf_path}")
+                    return []
+                
+                # Render straight from the source document; no intermediate cut PDF
+                for page_num in range(min(max_pages, len(pdf_document))):
+                    page = pdf_document[page_num]
+                    pix = page.get_pixmap(dpi=dpi, alpha=False)
+                    rgb = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+                    # PP-StructureV3 expects OpenCV-style BGR input for ndarray images
+                    images.append(np.ascontiguousarray(rgb[..., ::-1]))
             
             t_pdf_end = time.perf_counter()
             t_pdf = t_pdf_end - t_pdf_start
             
-            # Save images to temp directory
-            image_paths = []
-            for idx, page in enumerate(pages, start=1):
-                img_path = os.path.join(self.temp_dir, f"page_{idx}.png")
-                page.save(img_path, "PNG")
-                image_paths.append(img_path)
-            
-            logger.info(f"PDF converted to {len(image_paths)} images (time: {t_pdf:.3f}s)")
-            return image_paths
+            logger.info(f"PDF rendered to {len(images)} images (time: {t_pdf:.3f}s)")
+            return images
             
         except Exception as e:
-            logger.error(f"Error converting PDF to images: {str(e)}")
+            logger.error(f"Error rendering PDF to images: {str(e)}")
             return []
     
+    def _save_result_json(self, res, save_path: str):
+        """Write a pipeline result to JSON with orjson (numpy values serialized natively)"""
+        json_data = res.json
+        # Like save_to_json with an explicit *.json path: write the single payload ("res")
+        payload = next(iter(json_data.values())) if len(json_data) == 1 else json_data
+        with open(save_path, "wb") as f:
+            f.write(orjson.dumps(
+                payload,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+            ))
+    
     def process_single_pdf(self, pdf_path: str) -> dict:
         """Process a single PDF file with comprehensive logging"""
         try:
             pdf_name = Path(pdf_path).stem
             
-            if settings.log_processing_steps:
+            if self.settings.log_processing_steps:
                 logger.info("="*80)
                 logger.info(f"📄 PROCESSING: {pdf_name}")
                 logger.info("="*80)
@@ -201,64 +191,60 @@ class PipelineProcessor:
                 
             t_all_start = time.perf_counter()
             
-            # Step 1: Cut PDF to first 2 pages
-            if settings.log_processing_steps:
-                logger.info("📋 STEP 1: Preparing PDF...")
-            
-            temp_pdf_path = os.path.join(self.temp_dir, f"{pdf_name}_first2pages.pdf")
-            if not self.cut_pdf_to_first_two_pages(pdf_path, temp_pdf_path):
-                raise Exception(f"Failed to cut PDF: {pdf_path}")
-            
-            # Step 2: Convert PDF to images
-            if settings.log_processing_steps:
-                logger.info("🖼️  STEP 2: Converting PDF to images...")
+            # Step 1: Render first 2 pages of the PDF to images
+            if self.settings.log_processing_steps:
+                logger.info("🖼️  STEP 1: Converting first 2 PDF pages to images...")
                 
-            image_paths = self.pdf_to_images(temp_pdf_path, dpi=200)
-            if not image_paths:
-                raise Exception(f"Failed to convert PDF to images: {temp_pdf_path}")
+            images = self.pdf_to_images(pdf_path, max_pages=2)
+            if not images:
+                raise Exception(f"Failed to convert PDF to images: {pdf_path}")
                 
-            if settings.log_processing_steps:
-                logger.info(f"   ✅ Generated {len(image_paths)} images for processing")
+            if self.settings.log_processing_steps:
+                logger.info(f"   ✅ Generated {len(images)} images for processing")
             
-            # Step 3: Process each image with pipeline and save JSON results
-            if settings.log_processing_steps:
-                logger.info("🔍 STEP 3: Running OCR on each page...")
+            # Step 2: Process each image with pipeline and save JSON results
+            if self.settings.log_processing_steps:
+                logger.info("🔍 STEP 2: Running OCR on all pages (batched)...")
                 
             per_page_ocr_times = []
             t_ocr_total_start = time.perf_counter()
             
             json_output_dirs = []
             
-            for i, img_path in enumerate(image_paths, 1):
-                base_name = os.path.splitext(os.path.basename(img_path))[0]
-                
-                if settings.log_processing_steps:
-                    logger.info(f"   📄 Processing Page {i}/{len(image_paths)}: {base_name}")
-                else:
-                    logger.info(f"Processing image: {base_name}")
-                
-                t_page_start = time.perf_counter()
-                
-                # Run pipeline prediction
-                results = self.pipeline.predict(img_path)
-                
-                # Save results using the built-in save_to_json method
-                save_dir = os.path.join(settings.output_dir, f"{pdf_name}_{base_name}_results")
+            # Submit all pages in one call so the pipeline can batch them. predict()
+            # would return the finished list; predict_iter() yields each result as
+            # soon as its inference completes, so the time until the next result
+            # is that page's OCR time
+            t_page_start = time.perf_counter()
+            
+            for i, res in enumerate(self.pipeline.predict_iter(images), 1):
+                base_name = f"page_{i}"
                 
-                for res in results:
-                    res.save_to_json(save_path=save_dir)
+                # Save results as JSON (same layout as save_to_json, written with orjson)
+                save_dir = os.path.join(self.settings.output_dir, f"{pdf_name}_{base_name}_results")
+                os.makedirs(save_dir, exist_ok=True)
+                self._save_result_json(res, os.path.join(save_dir, f"{base_name}_res.json"))
                 
                 json_output_dirs.append(save_dir)
                 
+                # Per-page time = inference (inside predict_iter) + JSON save
                 t_page_end = time.perf_counter()
                 t_page = t_page_end - t_page_start
                 per_page_ocr_times.append(t_page)
                 
-                if settings.log_performance_metrics:
-                    logger.info(f"     ⏱️  Page {i} completed: {t_page:.3f}s")
-                    logger.info(f"     💾 Results saved to: {os.path.basename(save_dir)}")
+                # Per-page details go to DEBUG (file log); lazy "{}" args are only
+                # formatted when a handler accepts the record
+                if self.settings.log_processing_steps:
+                    logger.debug("   📄 Processed Page {}/{}: {}", i, len(images), base_name)
+                if self.settings.log_performance_metrics:
+                    logger.debug("     ⏱️  Page {} completed: {:.3f}s", i, t_page)
+                    logger.debug("     💾 Results saved to: {}", os.path.basename(save_dir))
                 else:
-                    logger.info(f"  ⤷ OCR+parse completed: {t_page:.3f}s (JSON saved to: {save_dir})")
+                    logger.debug("  ⤷ OCR+parse completed: {:.3f}s (JSON saved to: {})", t_page, save_dir)
+                
+                # Next page's inference runs when the loop pulls the next result;
+                # start its window after logging so log I/O isn't counted
+                t_page_start = time.perf_counter()
             
             t_ocr_total_end = time.perf_counter()
             t_ocr_total = t_ocr_total_end - t_ocr_total_start
@@ -266,18 +252,15 @@ class PipelineProcessor:
             t_all_end = time.perf_counter()
             t_all = t_all_end - t_all_start
             
-            # Clean up temporary files
-            self._cleanup_temp_files([temp_pdf_path] + image_paths)
-            
             # Final processing summary
-            if settings.log_performance_metrics:
+            if self.settings.log_performance_metrics:
                 logger.info("="*80)
                 logger.info("✅ PROCESSING COMPLETE")
                 logger.info("="*80)
                 logger.info(f"📊 Performance Summary:")
                 logger.info(f"   ⏱️  Total Time: {t_all:.3f}s")
                 logger.info(f"   🔍 OCR Time: {t_ocr_total:.3f}s ({(t_ocr_total/t_all*100):.1f}%)")
-                logger.info(f"   📄 Pages Processed: {len(image_paths)}")
+                logger.info(f"   📄 Pages Processed: {len(images)}")
                 logger.info(f"   ⚡ Avg per Page: {mean(per_page_ocr_times):.3f}s")
                 logger.info(f"   📁 Output Directories: {len(json_output_dirs)}")
                 logger.info("="*80)
@@ -295,7 +278,7 @@ class PipelineProcessor:
                     "ocr_average_per_page": round(mean(per_page_ocr_times) if per_page_ocr_times else 0, 3),
                     "per_page_times": [round(t, 3) for t in per_page_ocr_times]
                 },
-                "pages_processed": len(image_paths),
+                "pages_processed": len(images),
                 "timestamp": datetime.now().isoformat(),
                 "success": True
             }
@@ -309,35 +292,72 @@ class PipelineProcessor:
                 "success": False,
                 "timestamp": datetime.now().isoformat()
             }
-    
-    def _cleanup_temp_files(self, file_paths: list):
-        """Clean up temporary files"""
-        for file_path in file_paths:
-            try:
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-            except Exception as e:
-                logger.warning(f"Failed to cleanup temp file {file_path}: {str(e)}")
-    
-    def cleanup(self):
-        """Clean up temporary directory"""
-        try:
-            if self.temp_dir and os.path.exists(self.temp_dir):
-                import shutil
-                shutil.rmtree(self.temp_dir)
-                logger.info(f"Temporary directory cleaned up: {self.temp_dir}")
-        except Exception as e:
-            logger.warning(f"Error cleaning up temp directory: {str(e)}")
+
+
+# Characters dropped from output names (anything but word chars, spaces, dashes)
+_FILENAME_DROP_RE = re.compile(r"[^\w \-]+")
+# Runs of separators collapse to a single underscore
+_FILENAME_SEP_RE = re.compile(r"[ \-_]+")
 
 
 def clean_filename_for_output(filename: str) -> str:
     """Clean filename for use in output files"""
-    clean = Path(filename).stem.lower()
-    clean = clean.replace(' ', '_').replace('-', '_')
-    clean = ''.join(c for c in clean if c.isalnum() or c == '_')
-    while '__' in clean:
-        clean = clean.replace('__', '_')
-    return clean.strip('_')
+    clean = _FILENAME_DROP_RE.sub('', Path(filename).stem.lower())
+    return _FILENAME_SEP_RE.sub('_', clean).strip('_')
+
+
+CONSOLE_LOG_FORMAT = "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level}</level> | {message}"
+FILE_LOG_FORMAT = "{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}"
+
+# Thread-count variables read by OpenMP/MKL/OpenBLAS when they load
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+# Per-process PipelineProcessor for parallel batch runs (set by _init_worker)
+_worker_processor = None
+
+
+def _init_worker(log_file: str, settings):
+    """ProcessPoolExecutor initializer: set up logging and load the pipeline once per worker"""
+    global _worker_processor
+    
+    # Same sinks as main(): INFO to console, DEBUG (per-page details) to the run's log file
+    logger.remove()
+    logger.add(sys.stdout, format=CONSOLE_LOG_FORMAT, level="INFO")
+    logger.add(log_file, format=FILE_LOG_FORMAT, level="DEBUG")
+    
+    _worker_processor = PipelineProcessor(settings)
+
+
+def _process_one(pdf_path: str) -> dict:
+    """Process a single PDF in a worker process"""
+    return _worker_processor.process_single_pdf(pdf_path)
+
+
+def _record_result(summary: dict, pdf_path: str, result: dict):
+    """Add one processing result to the batch summary and log it"""
+    if result.get("success", False):
+        summary["successful"] += 1
+        summary["results"].append({
+            "file": os.path.basename(pdf_path),
+            "output_dirs": result["json_output_dirs"],
+            "processing_time": result["processing_times"]["total_seconds"],
+            "pages": result["pages_processed"],
+            "status": "success"
+        })
+        
+        logger.success(f"✓ Successfully processed: {os.path.basename(pdf_path)}")
+        for output_dir in result["json_output_dirs"]:
+            logger.info(f"  JSON results saved to: {output_dir}")
+        
+    else:
+        summary["failed"] += 1
+        summary["results"].append({
+            "file": os.path.basename(pdf_path),
+            "status": "failed",
+            "error": result.get("error", "Unknown error")
+        })
+        
+        logger.error(f"✗ Failed to process: {os.path.basename(pdf_path)}")
 
 
 def main():
@@ -347,19 +367,22 @@ def main():
     logger.remove()  # Remove default handler
     logger.add(
         sys.stdout, 
-        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level}</level> | {message}",
+        format=CONSOLE_LOG_FORMAT,
         level="INFO"
     )
     
     # Add file logging
     log_file = os.path.join("logs", f"pipeline_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
     os.makedirs("logs", exist_ok=True)
-    logger.add(log_file, format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}", level="DEBUG")
+    logger.add(log_file, format=FILE_LOG_FORMAT, level="DEBUG")
+    
+    settings = get_settings()
+    ensure_dirs(settings)
     
     logger.info("="*70)
     logger.info("TELKOM CONTRACT PIPELINE PROCESSOR")
     logger.info("="*70)
-    logger.info("Using PP-StructureV3 with built-in save_to_json() method")
+    logger.info("Using PP-StructureV3, raw JSON written with orjson (_save_result_json)")
     logger.info("Configuration: seal_recognition=False, formula_recognition=False")
     logger.info("="*70)
     
@@ -370,7 +393,6 @@ def main():
         # "tests/test_samples/KONTRAK SMK PENERBANGAN 2025 VALIDASI.pdf"
     ]
     
-    processor = None
     batch_start_time = time.perf_counter()
     summary = {
         "total_files": len(test_files),
@@ -380,44 +402,51 @@ def main():
     }
     
     try:
-        # Initialize processor
-        processor = PipelineProcessor()
-        
-        # Process each file
-        for i, pdf_path in enumerate(test_files, 1):
-            logger.info(f"\n[{i}/{len(test_files)}] Processing: {os.path.basename(pdf_path)}")
-            
+        pdf_files = []
+        for pdf_path in test_files:
             if not os.path.exists(pdf_path):
                 logger.error(f"File not found: {pdf_path}")
                 summary["failed"] += 1
                 continue
-            
-            # Process the document
-            result = processor.process_single_pdf(pdf_path)
-            
-            if result.get("success", False):
-                summary["successful"] += 1
-                summary["results"].append({
-                    "file": os.path.basename(pdf_path),
-                    "output_dirs": result["json_output_dirs"],
-                    "processing_time": result["processing_times"]["total_seconds"],
-                    "pages": result["pages_processed"],
-                    "status": "success"
-                })
-                
-                logger.success(f"✓ Successfully processed: {os.path.basename(pdf_path)}")
-                for output_dir in result["json_output_dirs"]:
-                    logger.info(f"  JSON results saved to: {output_dir}")
-                
-            else:
-                summary["failed"] += 1
-                summary["results"].append({
-                    "file": os.path.basename(pdf_path),
-                    "status": "failed",
-                    "error": result.get("error", "Unknown error")
-                })
+            pdf_files.append(pdf_path)
+        
+        workers = min(settings.pipeline_workers, len(pdf_files))
+        
+        if workers > 1:
+            # One PipelineProcessor per worker process, loaded once by the initializer.
+            # "spawn" so workers don't inherit a forked Paddle runtime.
+            # Keep N workers x M threads within the core count unless CPU_THREADS says otherwise
+            threads_per_worker = settings.cpu_threads or max(1, (os.cpu_count() or 1) // workers)
+            worker_settings = settings.model_copy(update={"cpu_threads": threads_per_worker})
+            logger.info(f"Processing {len(pdf_files)} files with {workers} workers ({threads_per_worker} threads each)")
+            
+            # Set in the parent: spawned workers inherit the environment at startup, before
+            # they import numpy/paddle (an initializer would run too late for OpenMP/OpenBLAS).
+            # Values the user already exported win.
+            for var in THREAD_ENV_VARS:
+                os.environ.setdefault(var, str(threads_per_worker))
+            
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(log_file, worker_settings),
+            ) as executor:
+                results = executor.map(_process_one, pdf_files)
+                for i, (pdf_path, result) in enumerate(zip(pdf_files, results), 1):
+                    logger.info(f"\n[{i}/{len(pdf_files)}] Finished: {os.path.basename(pdf_path)}")
+                    _record_result(summary, pdf_path, result)
+        else:
+            # Initialize processor
+            processor = PipelineProcessor(settings)
+            
+            # Process each file
+            for i, pdf_path in enumerate(pdf_files, 1):
+                logger.info(f"\n[{i}/{len(pdf_files)}] Processing: {os.path.basename(pdf_path)}")
                 
-                logger.error(f"✗ Failed to process: {os.path.basename(pdf_path)}")
+                # Process the document
+                result = processor.process_single_pdf(pdf_path)
+                _record_result(summary, pdf_path, result)
         
         # Print final summary
         batch_end_time = time.perf_counter()
@@ -456,9 +485,6 @@ def main():
         logger.error(f"Batch processing failed: {str(e)}")
         raise
     finally:
-        # Cleanup
-        if processor:
-            processor.cleanup()
         logger.info("Pipeline processing completed")
 
 
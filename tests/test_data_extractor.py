@@ -0,0 +1,20 @@
+from app.services.data_extractor import _extract_jangka_waktu, _parse_date_id
+
+
+def test_parse_date_id_formats():
+    assert _parse_date_id("2024-1-5") == "2024-01-05"
+    assert _parse_date_id("x 05/06/2023 y") == "2023-06-05"
+    assert _parse_date_id("1 Jan. 2024") == "2024-01-01"
+    assert _parse_date_id("01Januari2025") == "2025-01-01"
+    assert _parse_date_id("31 Desember2025") == "2025-12-31"
+    assert _parse_date_id("12 Foo 2025") is None
+
+
+def test_parse_date_id_rejected_month_does_not_hide_overlapping_date():
+    # "1 Tahun 2025" cocok dengan pola "D Month YYYY" tapi bukan bulan;
+    # tanggal ISO yang tumpang-tindih tetap harus ditemukan
+    assert _parse_date_id("1 Tahun 2025-01-05") == "2025-01-05"
+
+
+def test_jangka_fallback_rejected_month_does_not_hide_overlapping_date():
+    assert _extract_jangka_waktu(["x 1 Tahun 2025-01-05", "2025-12-31"]) == ("2025-01-05", "2025-12-31")